@@ -2,6 +2,7 @@
 Конфигурация приложения на основе переменных окружения
 """
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import List
 from pathlib import Path
@@ -28,10 +29,14 @@ class Settings(BaseSettings):
     JOB_TIMEOUT: int = 600  # seconds
     CLEANUP_AFTER: int = 24  # hours
     KEEP_FAILED_JOBS: bool = True
+    FRAME_WORKERS: int = 1  # процессов рендера кадров на задачу (1 = пул потоков)
+    DECODE_THREADS: int = 0  # потоков декодирования видео (0 = по числу ядер)
+    ENCODE_THREADS: int = 0  # потоков кодирования MP4 (0 = выбирает ffmpeg)
     
     # Video defaults
     DEFAULT_FPS: int = 30
     DEFAULT_CRF: int = 23
+    DEFAULT_PRESET: str = "veryfast"  # пресет libx264
     DEFAULT_WIDTH: int = 120
     DEFAULT_STYLE: str = "normal"
     
@@ -71,18 +76,18 @@ class Settings(BaseSettings):
 
 
 # Синглтон для получения настроек
-_settings = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Получить экземпляр конфигурации"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
 
 
 def reload_settings():
     """Перезагрузить конфигурацию"""
-    global _settings
-    _settings = Settings()
+    global settings
+    get_settings.cache_clear()
+    settings = get_settings()
+
+
+# Экземпляр настроек, создаётся один раз при импорте
+settings = get_settings()
@@ -0,0 +1,109 @@
+"""
+Хранилище статусов задач
+
+По умолчанию статусы хранятся в памяти процесса. При USE_REDIS=True каждая
+задача хранится в отдельном Redis-хеше job:{id} с TTL, поэтому статус виден
+из любого воркера uvicorn.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobDict(OrderedDict):
+    """Словарь задач ограниченного размера с вытеснением давно неиспользуемых"""
+
+    def __init__(self, max_size: int = 1024):
+        super().__init__()
+        self.max_size = max_size
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class JobStore:
+    """Асинхронное key-value хранилище полей задачи"""
+
+    KEY_PREFIX = "job:"
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 24 * 3600,
+        max_jobs: int = 1024,
+    ):
+        """
+        Args:
+            redis_url: URL Redis; если не задан, используется словарь в памяти
+            ttl_seconds: Время жизни записи задачи в Redis
+            max_jobs: Максимум задач в памяти, старые вытесняются
+        """
+        self.ttl_seconds = ttl_seconds
+        self._redis = None
+        self._jobs: Dict[str, Dict[str, Any]] = JobDict(max_jobs)
+
+        if redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+            logger.info(f"Статусы задач хранятся в Redis: {redis_url}")
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    async def set(self, job_id: str, **fields: Any) -> None:
+        """Создать задачу или обновить её поля"""
+        if self._redis is None:
+            job = self._jobs.get(job_id)
+            if job is None:
+                self._jobs[job_id] = dict(fields)
+            else:
+                job.update(fields)
+                self._jobs.move_to_end(job_id)
+            return
+
+        key = self._key(job_id)
+        mapping = {k: json.dumps(v, default=str) for k, v in fields.items()}
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Получить все поля задачи или None, если задача не найдена"""
+        if self._redis is None:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._jobs.move_to_end(job_id)
+            return dict(job)
+
+        raw = await self._redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {k: json.loads(v) for k, v in raw.items()}
+
+    async def delete(self, job_id: str) -> None:
+        """Удалить задачу"""
+        if self._redis is None:
+            self._jobs.pop(job_id, None)
+            return
+
+        await self._redis.delete(self._key(job_id))
+
+
+# Общее хранилище задач приложения
+job_store = JobStore(
+    redis_url=settings.REDIS_URL if settings.USE_REDIS else None,
+    ttl_seconds=settings.CLEANUP_AFTER * 3600,
+    max_jobs=max(1024, settings.MAX_CONCURRENT_JOBS * 64),
+)
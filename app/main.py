@@ -3,15 +3,15 @@ VID-API: FastAPI application entry point
 Основное приложение FastAPI для преобразования видео в ASCII
 """
 
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import logging
 from pathlib import Path
 
-from app.config import get_settings
+from app.config import settings
 from app.routes import convert, download, status, health, ws
 
 # Настройка логирования
@@ -21,9 +21,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Получить конфиг
-settings = get_settings()
-
 # Создать необходимые директории
 Path(settings.UPLOADS_DIR).mkdir(exist_ok=True)
 Path(settings.RESULTS_DIR).mkdir(exist_ok=True)
@@ -46,6 +43,7 @@ app = FastAPI(
     description="REST API для преобразования видео в ASCII-анимацию",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
@@ -62,11 +60,13 @@ app.add_middleware(
 
 
 # Подключить маршруты
-app.include_router(health.router, prefix="/api/v1", tags=["Health"])
-app.include_router(convert.router, prefix="/api/v1", tags=["Convert"])
-app.include_router(download.router, prefix="/api/v1", tags=["Download"])
-app.include_router(status.router, prefix="/api/v1", tags=["Status"])
-app.include_router(ws.router, prefix="/api/v1", tags=["WebSocket"])
+api_v1 = APIRouter(prefix=settings.API_V1_STR)
+api_v1.include_router(health.router, tags=["Health"])
+api_v1.include_router(convert.router, tags=["Convert"])
+api_v1.include_router(download.router, tags=["Download"])
+api_v1.include_router(status.router, tags=["Status"])
+api_v1.include_router(ws.router, tags=["WebSocket"])
+app.include_router(api_v1)
 
 
 # Глобальный обработчик исключений
@@ -74,7 +74,7 @@ app.include_router(ws.router, prefix="/api/v1", tags=["WebSocket"])
 async def global_exception_handler(request, exc):
     """Обработчик всех необработанных исключений"""
     logger.exception(f"Необработанное исключение: {str(exc)}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -6,6 +6,11 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+import re
+
+
+# Формат HEX цвета #RRGGBB
+_HEX_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
 
 
 class StyleEnum(str, Enum):
@@ -42,12 +47,8 @@ class ConvertRequest(BaseModel):
     @classmethod
     def validate_hex_color(cls, v):
         """Валидировать HEX цвета"""
-        if not v.startswith('#') or len(v) != 7:
+        if not _HEX_RE.fullmatch(v):
             raise ValueError('Цвет должен быть в формате #XXXXXX')
-        try:
-            int(v[1:], 16)
-        except ValueError:
-            raise ValueError('Некорректное HEX значение цвета')
         return v
 
 
@@ -4,29 +4,38 @@ API роуты для конвертации видео в ASCII
 
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse, FileResponse
+import aiofiles
+import contextlib
 import logging
+import os
+import shutil
 import uuid
 import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
 import asyncio
-import io
 import zipfile
 
-from app.config import get_settings
+from app.config import settings
+from app.job_store import job_store
 from app.models import ConvertRequest, ConvertResponse, JobStatus
+from app.routes.download import list_frames, zip_streaming_response
 from vid_core.converter import ASCIIConverter, ConvertConfig
-from vid_core.utils import ensure_dir, sanitize_filename
+from vid_core.utils import sanitize_filename
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-settings = get_settings()
+# Размер части при записи загружаемого файла на диск
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-# In-memory хранилище статусов задач (в production использовать Redis)
-JOBS_STATUS = {}
+# Интервал записи прогресса задачи в хранилище, секунды
+PROGRESS_FLUSH_INTERVAL = 0.2
 
+# Ограничение числа одновременно выполняемых конвертаций
+JOB_SEMAPHORE = asyncio.Semaphore(settings.MAX_CONCURRENT_JOBS)
 
 def create_job_id() -> str:
     """Создать уникальный ID задачи"""
@@ -74,38 +83,45 @@ async def convert_video(
     - **resolution**: Разрешение (low, medium, high, 4k)
     """
     job_id = create_job_id()
-    start_time = datetime.utcnow()
+    start_mono = time.monotonic()
+    start_wall = time.time()
     logger.info(f"Начата задача {job_id}: {file.filename}")
 
     # Обновить статус
-    JOBS_STATUS[job_id] = {
-        "status": "processing",
-        "progress": 0.0,
-        "message": "Загрузка файла...",
-        "started_at": start_time,
-    }
+    await job_store.set(
+        job_id,
+        status="processing",
+        progress=0.0,
+        message="Загрузка файла...",
+        started_at=start_wall,
+    )
 
+    temp_dir = None
     try:
-        # Проверить размер файла
-        content = await file.read()
-        file_size_mb = len(content) / (1024 * 1024)
-        if file_size_mb > settings.MAX_FILE_SIZE:
+        # Создать временный файл
+        temp_dir = Path(tempfile.mkdtemp(prefix=f"vid_api_{job_id}_"))
+        input_path = temp_dir / sanitize_filename(file.filename)
+
+        # Записать файл на диск по частям, проверяя размер на лету
+        max_bytes = settings.MAX_FILE_SIZE * 1024 * 1024
+        total = 0
+        async with aiofiles.open(input_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > max_bytes:
+                    break
+                await f.write(chunk)
+        if total > max_bytes:
+            shutil.rmtree(temp_dir, ignore_errors=True)
             raise HTTPException(
                 status_code=413,
-                detail=f"Файл слишком большой: {file_size_mb:.1f}MB > {settings.MAX_FILE_SIZE}MB",
+                detail=f"Файл слишком большой: > {settings.MAX_FILE_SIZE}MB",
             )
-
-        # Создать временный файл
-        temp_dir = Path(tempfile.gettempdir()) / f"vid_api_{job_id}"
-        ensure_dir(str(temp_dir))
-        input_path = temp_dir / sanitize_filename(file.filename)
-        with open(input_path, "wb") as f:
-            f.write(content)
+        file_size_mb = total / (1024 * 1024)
         logger.info(f"Файл загружен: {input_path} ({file_size_mb:.1f}MB)")
 
         # Обновить статус
-        JOBS_STATUS[job_id]["message"] = "Инициализация конвертера..."
-        JOBS_STATUS[job_id]["progress"] = 0.1
+        await job_store.set(job_id, message="Инициализация конвертера...", progress=0.1)
 
         # Создать конфиг
         config = ConvertConfig(
@@ -120,77 +136,128 @@ async def convert_video(
             text_color=text_color,
             fps=fps,
             crf=crf,
+            preset=settings.DEFAULT_PRESET,
+            encode_threads=settings.ENCODE_THREADS,
             save_txt=save_txt,
             save_png=save_png,
             save_mp4=save_mp4,
             resolution=resolution,
+            workers=settings.FRAME_WORKERS,
+            decode_threads=settings.DECODE_THREADS,
         )
 
-        # Создать конвертер
-        output_dir = Path(settings.RESULTS_DIR) / job_id
-        ensure_dir(str(output_dir))
-        converter = ASCIIConverter(str(output_dir), config)
-
-        # Функция для отчёта о прогрессе
-        def progress_callback(progress: float, frame_num: int, total: int):
-            JOBS_STATUS[job_id]["progress"] = 0.1 + progress * 0.8
-            JOBS_STATUS[job_id]["message"] = f"Обработано {frame_num}/{total} кадров"
-            JOBS_STATUS[job_id]["frames_processed"] = frame_num
-            JOBS_STATUS[job_id]["total_frames"] = total
-
-        # Выполнить конвертацию
-        result = converter.convert_video(str(input_path), progress_callback)
+        # Дождаться свободного слота обработки
+        if JOB_SEMAPHORE.locked():
+            await job_store.set(job_id, message="Ожидание свободного слота...")
+
+        async with JOB_SEMAPHORE:
+            # Создать конвертер
+            output_dir = Path(settings.RESULTS_DIR) / job_id
+            output_dir.mkdir(parents=True, exist_ok=True)
+            converter = ASCIIConverter(str(output_dir), config)
+
+            # Прогресс из потока конвертера складывается в очередь из одного
+            # элемента (последний снимок), а в хранилище пишется не чаще
+            # раза в PROGRESS_FLUSH_INTERVAL секунд
+            loop = asyncio.get_running_loop()
+            progress_q: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+            def put_latest(snapshot: dict):
+                if progress_q.full():
+                    progress_q.get_nowait()
+                progress_q.put_nowait(snapshot)
+
+            def progress_callback(progress: float, frame_num: int, total: int):
+                snapshot = {
+                    "progress": 0.1 + progress * 0.8,
+                    "message": f"Обработано {frame_num}/{total} кадров",
+                    "frames_processed": frame_num,
+                    "total_frames": total,
+                }
+                loop.call_soon_threadsafe(put_latest, snapshot)
+
+            writer = asyncio.create_task(flush_progress(job_id, progress_q))
+            try:
+                # Выполнить конвертацию в отдельном потоке, чтобы не блокировать event loop
+                result = await asyncio.to_thread(
+                    converter.convert_video, str(input_path), progress_callback
+                )
+            finally:
+                # Дождаться остановки записи, чтобы её запрос не лёг
+                # поверх финального статуса
+                writer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await writer
+                if not progress_q.empty():
+                    await job_store.set(job_id, **progress_q.get_nowait())
 
         # Обновить статус
-        JOBS_STATUS[job_id]["status"] = "completed"
-        JOBS_STATUS[job_id]["progress"] = 1.0
-        JOBS_STATUS[job_id]["message"] = "Готово"
-
-        JOBS_STATUS[job_id]["result"] = {
+        job_result = {
             "frames_count": result["frames_count"],
             "fps": result["fps"],
             "mp4_file": result.get("mp4_file"),
             "txt_files_count": result.get("txt_files_count", 0),
             "png_files_count": result.get("png_files_count", 0),
         }
+        await job_store.set(
+            job_id,
+            status="completed",
+            progress=1.0,
+            message="Готово",
+            result=job_result,
+        )
 
         # Очистить временные файлы (опционально)
         if background_tasks:
             background_tasks.add_task(cleanup_temp, str(temp_dir))
 
         logger.info(f"Задача {job_id} завершена успешно")
-        elapsed = (datetime.utcnow() - start_time).total_seconds()
+        elapsed = time.monotonic() - start_mono
 
         return ConvertResponse(
             job_id=job_id,
             status="completed",
             message="Конвертация завершена успешно",
-            result=JOBS_STATUS[job_id]["result"],
+            result=job_result,
             processing_time_seconds=elapsed,
-            started_at=start_time,
+            started_at=datetime.utcfromtimestamp(start_wall),
             completed_at=datetime.utcnow(),
         )
 
+    except HTTPException as e:
+        await job_store.set(job_id, status="failed", error=str(e.detail))
+        raise
+
     except Exception as e:
         logger.error(f"Ошибка в задаче {job_id}: {str(e)}", exc_info=True)
-        JOBS_STATUS[job_id]["status"] = "failed"
-        JOBS_STATUS[job_id]["error"] = str(e)
+        await job_store.set(job_id, status="failed", error=str(e))
+        # cleanup_temp запускается только после успешной конвертации
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
         raise HTTPException(
             status_code=500,
             detail=f"Ошибка конвертации: {str(e)}",
         )
 
 
+async def flush_progress(job_id: str, progress_q: asyncio.Queue):
+    """Периодически сохранять последний снимок прогресса задачи"""
+    while True:
+        await asyncio.sleep(PROGRESS_FLUSH_INTERVAL)
+        if not progress_q.empty():
+            await job_store.set(job_id, **progress_q.get_nowait())
+
+
 @router.get("/status/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str):
     """Получить статус задачи"""
-    if job_id not in JOBS_STATUS:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(
             status_code=404,
             detail=f"Задача {job_id} не найдена",
         )
 
-    job = JOBS_STATUS[job_id]
     return JobStatus(
         job_id=job_id,
         status=job["status"],
@@ -206,23 +273,27 @@ async def get_job_status(job_id: str):
 @router.get("/download/{job_id}/video")
 async def download_video(job_id: str):
     """Скачать MP4 видео"""
-    if job_id not in JOBS_STATUS:
+    job = await job_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
-    if JOBS_STATUS[job_id]["status"] != "completed":
+    if job["status"] != "completed":
         raise HTTPException(
             status_code=400,
-            detail=f"Задача еще не завершена: {JOBS_STATUS[job_id]['status']}",
+            detail=f"Задача еще не завершена: {job['status']}",
         )
 
     output_dir = Path(settings.RESULTS_DIR) / job_id
     video_path = output_dir / "ascii_video.mp4"
 
-    if not video_path.exists():
+    try:
+        stat_result = os.stat(video_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="MP4 видео не найдено")
 
     return FileResponse(
         path=str(video_path),
+        stat_result=stat_result,
         media_type="video/mp4",
         filename=f"ascii_video_{job_id}.mp4",
     )
@@ -235,7 +306,7 @@ async def download_frame(job_id: str, index: int = 0):
 
     GET /api/v1/download/<job_id>/frame/0 -> frame_000000.png
     """
-    if job_id not in JOBS_STATUS:
+    if await job_store.get(job_id) is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
     if index < 0:
@@ -257,39 +328,25 @@ async def download_frame(job_id: str, index: int = 0):
 @router.get("/download/{job_id}/frames")
 async def download_frames(job_id: str, format: str = "png"):
     """Скачать все кадры в ZIP"""
-    if job_id not in JOBS_STATUS:
+    if await job_store.get(job_id) is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
-    output_dir = Path(settings.RESULTS_DIR) / job_id
-
-    if format == "png":
-        frame_files = sorted(output_dir.glob("frame_*.png"))
-    elif format == "txt":
-        frame_files = sorted(output_dir.glob("frame_*.txt"))
-    else:
+    if format not in ("png", "txt"):
         raise HTTPException(status_code=400, detail="Неподдерживаемый формат")
 
+    frame_files = list_frames(job_id, format)
     if not frame_files:
         raise HTTPException(status_code=404, detail=f"Кадры формата {format} не найдены")
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for frame_file in frame_files:
-            zf.write(frame_file, arcname=frame_file.name)
-
-    zip_buffer.seek(0)
-
-    return FileResponse(
-        path=zip_buffer,
-        media_type="application/zip",
-        filename=f"ascii_frames_{job_id}_{format}.zip",
+    # PNG уже сжаты, повторное DEFLATE-сжатие только тратит CPU
+    compression = zipfile.ZIP_STORED if format == "png" else zipfile.ZIP_DEFLATED
+    return zip_streaming_response(
+        frame_files, f"ascii_frames_{job_id}_{format}.zip", compression
     )
 
 
 async def cleanup_temp(temp_dir: str):
     """Очистить временную директорию"""
-    import shutil
-
     try:
         shutil.rmtree(temp_dir)
         logger.debug(f"Очищена временная директория: {temp_dir}")
@@ -1,24 +1,87 @@
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterable, Iterator, Tuple
 import logging
-import io
+import os
 import zipfile
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 
-from app.config import get_settings
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["download"])
 
-settings = get_settings()
-
 
 def get_job_dir(job_id: str) -> Path:
     """Директория с результатами для указанного job_id."""
     return Path(settings.RESULTS_DIR) / job_id
 
 
+@lru_cache(maxsize=256)
+def _list_frames(job_id: str, fmt: str, mtime_ns: int) -> Tuple[Path, ...]:
+    """Отсортированный список кадров; mtime_ns директории сбрасывает кэш при изменениях."""
+    return tuple(sorted(get_job_dir(job_id).glob(f"frame_*.{fmt}")))
+
+
+def list_frames(job_id: str, fmt: str) -> Tuple[Path, ...]:
+    """Список файлов кадров задачи в формате fmt (png/txt)."""
+    try:
+        mtime_ns = get_job_dir(job_id).stat().st_mtime_ns
+    except FileNotFoundError:
+        return ()
+    return _list_frames(job_id, fmt, mtime_ns)
+
+
+class ZipStream:
+    """
+    Несекабельный file-like объект для потоковой записи ZIP.
+
+    zipfile пишет в него данные, а генератор забирает накопленные байты
+    через drain() после каждого добавленного файла.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(files: Iterable[Path], compression: int = zipfile.ZIP_DEFLATED) -> Iterator[bytes]:
+    """Генерировать ZIP архив из файлов по частям, не держа его целиком в памяти."""
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", compression) as zf:
+        for file_path in files:
+            zf.write(file_path, arcname=file_path.name)
+            yield stream.drain()
+    # Центральный каталог дописывается при закрытии архива
+    yield stream.drain()
+
+
+def zip_streaming_response(
+    files: Iterable[Path],
+    filename: str,
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> StreamingResponse:
+    """StreamingResponse, отдающий файлы одним ZIP архивом."""
+    return StreamingResponse(
+        iter_zip(files, compression),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/download/{job_id}/video")
 async def download_video(job_id: str):
     """
@@ -29,12 +92,15 @@ async def download_video(job_id: str):
     job_dir = get_job_dir(job_id)
     video_path = job_dir / "ascii_video.mp4"
 
-    if not video_path.exists():
+    try:
+        stat_result = os.stat(video_path)
+    except FileNotFoundError:
         logger.warning(f"MP4 not found for job {job_id}: {video_path}")
         raise HTTPException(status_code=404, detail="MP4 видео не найдено")
 
     return FileResponse(
         path=str(video_path),
+        stat_result=stat_result,
         media_type="video/mp4",
         filename=f"ascii_video_{job_id}.mp4",
     )
@@ -77,31 +143,16 @@ async def download_frames_archive(job_id: str, format: str = "png"):
       GET /api/v1/download/abcd1234/frames?format=png
       GET /api/v1/download/abcd1234/frames?format=txt
     """
-    job_dir = get_job_dir(job_id)
-
-    if format == "png":
-        pattern = "frame_*.png"
-    elif format == "txt":
-        pattern = "frame_*.txt"
-    else:
+    if format not in ("png", "txt"):
         raise HTTPException(status_code=400, detail="Поддерживаются только форматы png или txt")
 
-    frame_files = sorted(job_dir.glob(pattern))
+    frame_files = list_frames(job_id, format)
     if not frame_files:
         logger.warning(f"No frames found for job {job_id} with format={format}")
         raise HTTPException(status_code=404, detail=f"Кадры формата {format} не найдены")
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        for frame_file in frame_files:
-            zf.write(frame_file, arcname=frame_file.name)
-
-    zip_buffer.seek(0)
-
-    # В FileResponse можно передать file-like объект через path=zip_buffer,
-    # FastAPI/Starlette корректно его отдаст
-    return FileResponse(
-        path=zip_buffer,
-        media_type="application/zip",
-        filename=f"ascii_frames_{job_id}_{format}.zip",
+    # PNG уже сжаты, повторное DEFLATE-сжатие только тратит CPU
+    compression = zipfile.ZIP_STORED if format == "png" else zipfile.ZIP_DEFLATED
+    return zip_streaming_response(
+        frame_files, f"ascii_frames_{job_id}_{format}.zip", compression
     )
@@ -5,17 +5,16 @@ Health check роуты
 from fastapi import APIRouter
 from datetime import datetime
 import logging
+import time
 
-from app.config import get_settings
+from app.config import settings
 from app.models import HealthResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-settings = get_settings()
-
-# Время запуска сервера
-START_TIME = datetime.utcnow()
+# Время запуска сервера (монотонные часы, для расчёта uptime)
+START_MONO = time.monotonic()
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -25,7 +24,7 @@ async def health_check():
     
     Возвращает статус сервера и основную информацию
     """
-    uptime = (datetime.utcnow() - START_TIME).total_seconds()
+    uptime = time.monotonic() - START_MONO
     
     return HealthResponse(
         status="healthy",
@@ -56,4 +55,5 @@ async def get_config():
         "min_width": 10,
         "default_fps": settings.DEFAULT_FPS,
         "default_crf": settings.DEFAULT_CRF,
+        "default_preset": settings.DEFAULT_PRESET,
     }
@@ -92,6 +92,11 @@ JOB_STATUS_COMPLETED = "completed"
 JOB_STATUS_FAILED = "failed"
 JOB_STATUS_CANCELLED = "cancelled"
 
+# Конвейер обработки кадров
+FRAME_QUEUE_SIZE = 8  # Максимум кадров в очереди между стадиями
+PNG_COMPRESSION = 1  # Уровень zlib для PNG кадров (0-9), быстрое сжатие
+FFMPEG_STDERR_LINES = 200  # Хранимый хвост вывода ffmpeg для сообщений об ошибке
+
 # Таймауты
 VIDEO_READ_TIMEOUT = 60  # секунды
 FRAME_PROCESSING_TIMEOUT = 10  # секунды
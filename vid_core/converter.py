@@ -5,10 +5,17 @@
 """
 
 import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from dataclasses import dataclass
 import subprocess
 from PIL import Image, ImageDraw, ImageFont
@@ -21,6 +28,9 @@ from vid_core.constants import (
     FRAME_PNG_EXT,
     FRAME_TXT_EXT,
     VIDEO_MP4_EXT,
+    FRAME_QUEUE_SIZE,
+    PNG_COMPRESSION,
+    FFMPEG_STDERR_LINES,
 )
 from vid_core.utils import (
     hex_to_rgb,
@@ -32,6 +42,55 @@ from vid_core.utils import (
 logger = logging.getLogger(__name__)
 
 
+class FFmpegProcess:
+    """
+    Процесс ffmpeg, stderr которого вычитывается фоновым потоком.
+
+    Хранятся только последние FFMPEG_STDERR_LINES строк: вывод не копится
+    в памяти и не может заполнить pipe и остановить кодирование.
+    """
+
+    def __init__(self, cmd: list, stdin=None):
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=stdin,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+        self._stderr_tail = deque(maxlen=FFMPEG_STDERR_LINES)
+        self._stderr_reader = threading.Thread(
+            target=self._read_stderr, name="ffmpeg-stderr", daemon=True
+        )
+        self._stderr_reader.start()
+
+    def _read_stderr(self):
+        for line in self.proc.stderr:
+            self._stderr_tail.append(line)
+
+    @property
+    def stdin(self):
+        return self.proc.stdin
+
+    @property
+    def stderr_text(self) -> str:
+        return b"".join(self._stderr_tail).decode(errors="replace")
+
+    def wait(self) -> int:
+        """Закрыть stdin, дождаться завершения и вернуть код возврата"""
+        if self.proc.stdin:
+            try:
+                self.proc.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+        returncode = self.proc.wait()
+        self._stderr_reader.join()
+        return returncode
+
+    def kill(self):
+        self.proc.kill()
+        self.wait()
+
+
 @dataclass
 class ConvertConfig:
     """Конфигурация преобразования"""
@@ -46,10 +105,14 @@ class ConvertConfig:
     text_color: str = "#00FF00"
     fps: int = 30
     crf: int = 23
+    preset: str = "veryfast"  # пресет libx264
+    encode_threads: int = 0  # потоков кодировщика, 0 - выбирает ffmpeg
     save_txt: bool = False
     save_png: bool = True
     save_mp4: bool = True
     resolution: str = "high"  # low / medium / high / 4k
+    workers: int = 1  # >1: рендер кадров в пуле процессов
+    decode_threads: int = 0  # потоков декодера FFmpeg, 0 - по числу ядер
 
 
 class ASCIIConverter:
@@ -73,7 +136,15 @@ class ASCIIConverter:
         """
         self.output_dir = Path(output_dir)
         self.config = config
-        self.ascii_set = ASCII_SETS.get(config.style, ASCII_SETS["normal"])
+        self.ascii_set = ASCII_SETS.get(config.style) or ASCII_SETS["normal"]
+        # Коды символов набора для векторизованного преобразования кадра:
+        # однобайтовые для чистого ASCII, иначе UTF-32 (блоки, точки)
+        if self.ascii_set.isascii():
+            self._ascii_lut = np.frombuffer(self.ascii_set.encode("ascii"), dtype=np.uint8)
+            self._text_encoding = "ascii"
+        else:
+            self._ascii_lut = np.array([ord(ch) for ch in self.ascii_set], dtype="<u4")
+            self._text_encoding = "utf-32-le"
         self.bg_color_rgb = hex_to_rgb(config.bg_color)
         self.text_color_rgb = hex_to_rgb(config.text_color)
 
@@ -81,11 +152,30 @@ class ASCIIConverter:
         self.height = int(config.width * DEFAULT_CHAR_ASPECT_RATIO)
 
         # Целевое пиксельное разрешение выходного кадра/видео
-        if config.resolution not in self.RESOLUTIONS:
+        resolution = self.RESOLUTIONS.get(config.resolution)
+        if resolution is None:
             logger.warning(f"Неизвестное разрешение {config.resolution}, используется 'high'")
-            self.out_width, self.out_height = self.RESOLUTIONS["high"]
-        else:
-            self.out_width, self.out_height = self.RESOLUTIONS[config.resolution]
+            resolution = self.RESOLUTIONS["high"]
+        self.out_width, self.out_height = resolution
+        # Высота должна быть чётной для h264 (yuv420p)
+        self.out_height += self.out_height & 1
+
+        # Шрифт и атлас глифов не меняются в течение всего видео
+        self._setup_font()
+        self._glyph_atlas = self._build_glyph_atlas()
+        # Цвет пикселя (BGR, как принято в OpenCV) для каждого значения
+        # альфы глифа (0-255)
+        alpha = np.arange(256, dtype=np.uint32)[:, None]
+        bg = np.array(self.bg_color_rgb[::-1], dtype=np.uint32)
+        fg = np.array(self.text_color_rgb[::-1], dtype=np.uint32)
+        self._alpha_colors = ((bg * (255 - alpha) + fg * alpha + 127) // 255).astype(np.uint8)
+        # Пустой кадр цвета фона, копируется для каждого нового кадра
+        self._blank_canvas = np.empty((self.out_height, self.out_width, 3), dtype=np.uint8)
+        self._blank_canvas[:] = self._alpha_colors[0]
+        # Таблицы коррекций и квантования постоянны для всего видео
+        self._setup_luts()
+        # Без PNG кадры для MP4 кодируются сразу, минуя файлы на диске
+        self._pipe_mp4 = config.save_mp4 and not config.save_png
 
         ensure_dir(str(self.output_dir))
         logger.info(
@@ -101,56 +191,123 @@ class ASCIIConverter:
         """Применить коррекцию яркости"""
         if self.config.brightness == 1.0:
             return img
-        return np.clip(img * self.config.brightness, 0, 255).astype(np.uint8)
+        return cv2.LUT(img, self._brightness_lut)
 
     def contrast_correction(self, img: np.ndarray) -> np.ndarray:
         """Применить коррекцию контраста"""
         if self.config.contrast == 1.0:
             return img
-        mean = img.mean()
-        return np.clip((img - mean) * self.config.contrast + mean, 0, 255).astype(np.uint8)
+        return cv2.LUT(img, self._contrast_lut(img, self._identity_lut))
+
+    def _contrast_lut(self, img: np.ndarray, lut: np.ndarray) -> np.ndarray:
+        """
+        Таблица контраста поверх таблицы lut для кадра img.
+
+        Среднее кадра после lut считается точно по гистограмме img.
+        """
+        hist = np.bincount(img.ravel(), minlength=256)
+        mean = hist @ lut / img.size
+        levels = lut.astype(np.float64)
+        return np.clip((levels - mean) * self.config.contrast + mean, 0, 255).astype(np.uint8)
 
     def gamma_correction(self, img: np.ndarray) -> np.ndarray:
         """Применить гамма-коррекцию"""
-        if self.config.gamma == 1.0:
+        if self._gamma_lut is None:
             return img
-        inv_gamma = 1.0 / self.config.gamma
-        table = np.array([((i / 255.0) ** inv_gamma) * 255 for i in range(256)]).astype(np.uint8)
-        return cv2.LUT(img, table)
+        return cv2.LUT(img, self._gamma_lut)
+
+    def _setup_luts(self):
+        """Построить таблицы яркости, гаммы и квантования в индекс символа"""
+        levels = np.arange(256, dtype=np.float64)
+        self._identity_lut = np.arange(256, dtype=np.uint8)
+        self._brightness_lut = np.clip(levels * self.config.brightness, 0, 255).astype(np.uint8)
+        self._gamma_lut = None
+        if self.config.gamma != 1.0:
+            self._gamma_lut = ((levels / 255.0) ** (1.0 / self.config.gamma) * 255).astype(np.uint8)
+        # Без контраста вся коррекция - одна постоянная таблица
+        self._color_lut = None
+        if self.config.contrast == 1.0 and (self.config.brightness != 1.0 or self.config.gamma != 1.0):
+            self._color_lut = self._compose_luts(self._brightness_lut)
+        # Квантование яркости в индекс символа набора (0..L-1)
+        self._index_lut = (
+            np.arange(256, dtype=np.uint16) * (len(self._ascii_lut) - 1) // 255
+        ).astype(np.uint8)
+
+    def _compose_luts(self, lut: np.ndarray) -> np.ndarray:
+        """Дополнить таблицу гамма-коррекцией"""
+        if self._gamma_lut is None:
+            return lut
+        return self._gamma_lut[lut]
 
     def apply_color_corrections(self, frame: np.ndarray) -> np.ndarray:
-        """Применить все коррекции цвета"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = self.brightness_correction(gray)
-        gray = self.contrast_correction(gray)
-        gray = self.gamma_correction(gray)
-        return gray
+        """Применить все коррекции цвета к BGR кадру"""
+        return self.apply_gray_corrections(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
 
-    def frame_to_ascii(self, frame: np.ndarray) -> str:
+    def apply_gray_corrections(self, gray: np.ndarray) -> np.ndarray:
         """
-        Преобразовать кадр видео в ASCII текст
+        Применить все коррекции к кадру в градациях серого одним проходом cv2.LUT.
+
+        Яркость, контраст и гамма поэлементны, поэтому сворачиваются в одну
+        таблицу uint8 -> uint8. Среднее для контраста считается точно по
+        гистограмме кадра, пропущенной через таблицу яркости.
+        """
+        lut = self._frame_lut(gray)
+        if lut is None:
+            return gray
+        return cv2.LUT(gray, lut)
+
+    def _frame_lut(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """Общая таблица коррекций для кадра или None, если коррекций нет"""
+        if self.config.contrast == 1.0:
+            return self._color_lut
+        return self._compose_luts(self._contrast_lut(gray, self._brightness_lut))
+
+    def frame_to_indices(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Преобразовать кадр видео в матрицу индексов символов ASCII-набора
 
         Args:
             frame: OpenCV кадр (BGR)
 
         Returns:
-            ASCII текст кадра
+            Массив (height, width) индексов в self.ascii_set
         """
-        gray = self.apply_color_corrections(frame)
+        # Сначала уменьшить до сетки символов: цветовое преобразование
+        # и коррекции обрабатывают только width x height пикселей.
+        # INTER_AREA усредняет пиксели при уменьшении, при увеличении
+        # маленького видео он сводится к ближайшему соседу
+        if frame.shape[1] >= self.config.width and frame.shape[0] >= self.height:
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_CUBIC
+        small = cv2.resize(frame, (self.config.width, self.height), interpolation=interpolation)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
 
-        resized = cv2.resize(gray, (self.config.width, self.height))
-        normalized = resized.astype(np.float32) / 255.0
+        # Коррекции и квантование в индекс символа - один проход cv2.LUT
+        lut = self._frame_lut(gray)
+        index_lut = self._index_lut if lut is None else self._index_lut[lut]
+        return cv2.LUT(gray, index_lut)
 
-        lines = []
-        for row in normalized:
-            line_chars = []
-            for pixel in row:
-                idx = int(pixel * (len(self.ascii_set) - 1))
-                line_chars.append(self.ascii_set[idx])
-            lines.append("".join(line_chars))
+    def indices_to_ascii(self, indices: np.ndarray) -> str:
+        """Собрать ASCII текст из матрицы индексов символов"""
+        chars = self._ascii_lut[indices]
 
-        ascii_text = "\n".join(lines)
-        return ascii_text
+        # Дописать столбец переводов строк и собрать текст одним decode
+        newlines = np.full((chars.shape[0], 1), ord("\n"), dtype=chars.dtype)
+        lines = np.concatenate([chars, newlines], axis=1)
+        return lines.tobytes()[:-chars.itemsize].decode(self._text_encoding)
+
+    def frame_to_ascii(self, frame: np.ndarray) -> str:
+        """
+        Преобразовать кадр видео в ASCII текст
+
+        Args:
+            frame: OpenCV кадр (BGR)
+
+        Returns:
+            ASCII текст кадра
+        """
+        return self.indices_to_ascii(self.frame_to_indices(frame))
 
     def save_frame_txt(self, ascii_text: str, frame_number: int) -> Path:
         """Сохранить ASCII кадр в текстовый файл"""
@@ -158,90 +315,167 @@ class ASCIIConverter:
         filepath = self.output_dir / filename
 
         try:
-            filepath.write_text(ascii_text)
-            logger.debug(f"Сохранён текстовый кадр: {filepath}")
+            # Байты пишутся напрямую, без текстовой обёртки и локали
+            filepath.write_bytes(ascii_text.encode("utf-8"))
+            logger.debug("Сохранён текстовый кадр: %s", filepath)
             return filepath
         except Exception as e:
             logger.error(f"Ошибка при сохранении текстового кадра: {str(e)}")
             raise
 
-    def render_frame_png(self, ascii_text: str, frame_number: int) -> Path:
+    def _pick_font(self, target_cols: int, target_rows: int):
+        """
+        Подобрать максимальный размер шрифта, при котором сетка символов
+        занимает не больше 90% кадра по обеим осям.
+
+        Returns:
+            Кортеж (font, char_w, char_h)
+        """
+        base_font_size = 40  # верхняя граница, дальше будем уменьшать
+
+        # Идём от большего к меньшему, чтобы максимально заполнить кадр
+        for size in range(base_font_size, 4, -1):
+            font = None
+            for font_name in ["DejaVuSansMono.ttf", "Courier New.ttf", "consola.ttf"]:
+                try:
+                    font = ImageFont.truetype(font_name, size)
+                    break
+                except Exception:
+                    continue
+            if font is None:
+                font = ImageFont.load_default()
+
+            # Оценим размер одного символа
+            bbox = font.getbbox("X")
+            char_w = bbox[2] - bbox[0]
+            char_h = bbox[3] - bbox[1]
+
+            text_w = char_w * target_cols
+            text_h = char_h * target_rows
+
+            # Влезает ли в 90% кадра по обеим осям
+            if text_w <= self.out_width * 0.9 and text_h <= self.out_height * 0.9:
+                return font, char_w, char_h
+
+        # Если ничего не подошло, fallback
+        font = ImageFont.load_default()
+        bbox = font.getbbox("X")
+        return font, (bbox[2] - bbox[0]), (bbox[3] - bbox[1])
+
+    def _setup_font(self):
+        """Выбрать шрифт и рассчитать геометрию сетки символов в кадре"""
+        target_cols = max(self.config.width, 1)
+        target_rows = max(self.height, 1)
+        self._font, self._char_w, self._char_h = self._pick_font(target_cols, target_rows)
+
+        # Центрируем текст в кадре
+        text_width_px = self._char_w * target_cols
+        text_height_px = self._char_h * target_rows
+        self._x_offset = int((self.out_width - text_width_px) / 2)
+        self._y_offset = int((self.out_height - text_height_px) / 2)
+
+    def _build_glyph_atlas(self) -> np.ndarray:
+        """
+        Растеризовать каждый символ ASCII-набора один раз.
+
+        Глифы могут выходить за ячейку сетки по вертикали (блоки, "@") и по
+        горизонтали (блоки на пиксель левее "X"), поэтому атлас содержит
+        целое число полос высотой char_h и шириной char_w, а
+        self._atlas_top / self._atlas_left - смещение первой полосы
+        относительно верхнего левого угла ячейки.
+
+        Returns:
+            Массив (len(ascii_set), v_bands * char_h, h_bands * char_w)
+            с альфой глифов
+        """
+        char_w, char_h = self._char_w, self._char_h
+
+        # Ячейка сетки совпадает с рамкой "X"
+        x_bbox = self._font.getbbox("X")
+        glyph_boxes = [self._font.getbbox(ch) for ch in self.ascii_set]
+        top = min([0] + [box[1] - x_bbox[1] for box in glyph_boxes])
+        bottom = max([char_h] + [box[3] - x_bbox[1] for box in glyph_boxes])
+        left = min([0] + [box[0] - x_bbox[0] for box in glyph_boxes])
+        right = max([char_w] + [box[2] - x_bbox[0] for box in glyph_boxes])
+
+        self._atlas_top = (top // char_h) * char_h
+        self._atlas_left = (left // char_w) * char_w
+        v_bands = -((self._atlas_top - bottom) // char_h)
+        h_bands = -((self._atlas_left - right) // char_w)
+
+        # Положение верхнего левого угла маски текста в кадре
+        self._mask_origin = (
+            self._y_offset + x_bbox[1] + self._atlas_top,
+            self._x_offset + x_bbox[0] + self._atlas_left,
+        )
+
+        origin = (-x_bbox[0] - self._atlas_left, -x_bbox[1] - self._atlas_top)
+        glyphs = []
+        for ch in self.ascii_set:
+            glyph = Image.new("L", (h_bands * char_w, v_bands * char_h), 0)
+            ImageDraw.Draw(glyph).text(origin, ch, fill=255, font=self._font)
+            glyphs.append(np.asarray(glyph, dtype=np.uint8))
+        return np.stack(glyphs)
+
+    def render_frame_image(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Отрендерить кадр из матрицы индексов символов через атлас глифов.
+
+        Returns:
+            BGR кадр (out_height, out_width, 3) uint8
         """
-        Отрендерить ASCII кадр в PNG с адаптацией размера символа под целевое разрешение.
+        rows, cols = indices.shape
+        char_h, char_w = self._char_h, self._char_w
+        v_bands = self._glyph_atlas.shape[1] // char_h
+        h_bands = self._glyph_atlas.shape[2] // char_w
+
+        # Прозрачность текста: каждая полоса атласа раскладывается сеткой
+        # (rows, cols, char_h, char_w) -> (rows*char_h, cols*char_w).
+        # Перекрытия соседних символов складываются как alpha-over, как при
+        # последовательной отрисовке символов PIL: 1 - (1 - a1) * (1 - a2)
+        clear = np.full(
+            ((rows + v_bands - 1) * char_h, (cols + h_bands - 1) * char_w),
+            255,
+            dtype=np.uint16,
+        )
+        for v in range(v_bands):
+            for h in range(h_bands):
+                tiles = self._glyph_atlas[
+                    :, v * char_h:(v + 1) * char_h, h * char_w:(h + 1) * char_w
+                ][indices]
+                tiles = tiles.transpose(0, 2, 1, 3).reshape(rows * char_h, cols * char_w)
+                region = clear[v * char_h:v * char_h + rows * char_h,
+                               h * char_w:h * char_w + cols * char_w]
+                region *= 255 - tiles
+                region += 127
+                region //= 255
+        mask = (255 - clear).astype(np.uint8)
+
+        img_width = self.out_width
+        img_height = self.out_height
+        canvas = self._blank_canvas.copy()
+
+        # Позиция маски в кадре с обрезкой по границам
+        y0, x0 = self._mask_origin
+        top, left = max(y0, 0), max(x0, 0)
+        bottom = min(y0 + mask.shape[0], img_height)
+        right = min(x0 + mask.shape[1], img_width)
+        mask = mask[top - y0:bottom - y0, left - x0:right - x0]
+        canvas[top:bottom, left:right] = self._alpha_colors[mask]
+        return canvas
+
+    def render_frame_png(self, indices: np.ndarray, frame_number: int) -> Path:
+        """
+        Отрендерить кадр в PNG из матрицы индексов символов.
         """
         try:
-            lines = ascii_text.split("\n")
-            num_lines = max(len(lines), 1)
-
-            # Целевое пиксельное разрешение выхода
-            img_width = self.out_width
-            img_height = self.out_height
-
-            # Количество столбцов/строк в символах
-            target_cols = max(self.config.width, 1)
-            target_rows = num_lines
-
-            base_font_size = 40  # верхняя граница, дальше будем уменьшать
-
-            def pick_font_size():
-                # Идём от большего к меньшему, чтобы максимально заполнить кадр
-                for size in range(base_font_size, 4, -1):
-                    font_local = None
-                    for font_name in ["DejaVuSansMono.ttf", "Courier New.ttf", "consola.ttf"]:
-                        try:
-                            font_local = ImageFont.truetype(font_name, size)
-                            break
-                        except Exception:
-                            continue
-                    if font_local is None:
-                        font_local = ImageFont.load_default()
-
-                    # Оценим размер одного символа
-                    bbox = font_local.getbbox("X")
-                    char_w = bbox[2] - bbox[0]
-                    char_h = bbox[3] - bbox[1]
-
-                    text_w = char_w * target_cols
-                    text_h = char_h * target_rows
-
-                    # Влезает ли в 90% кадра по обеим осям
-                    if text_w <= img_width * 0.9 and text_h <= img_height * 0.9:
-                        return font_local, char_w, char_h
-
-                # Если ничего не подошло, fallback
-                font_fallback = ImageFont.load_default()
-                bbox = font_fallback.getbbox("X")
-                return font_fallback, (bbox[2] - bbox[0]), (bbox[3] - bbox[1])
-
-            font, char_w, char_h = pick_font_size()
-
-            text_width_px = char_w * target_cols
-            text_height_px = char_h * target_rows
-
-            # Центрируем текст в кадре
-            x_offset = int((img_width - text_width_px) / 2)
-            y_offset = int((img_height - text_height_px) / 2)
-
-            bg_color_rgb = tuple(self.bg_color_rgb)
-            text_color_rgb = tuple(self.text_color_rgb)
-            img = Image.new("RGB", (img_width, img_height), bg_color_rgb)
-            draw = ImageDraw.Draw(img)
-
-            for row_idx, line in enumerate(lines):
-                padded_line = line.ljust(target_cols)
-                y = y_offset + row_idx * char_h
-                for col_idx, ch in enumerate(padded_line):
-                    x = x_offset + col_idx * char_w
-                    draw.text((x, y), ch, fill=text_color_rgb, font=font)
-
-            # Высота должна быть чётной для h264
-            if img_height % 2 != 0:
-                img = img.resize((img_width, img_height + 1), Image.NEAREST)
+            canvas = self.render_frame_image(indices)
 
             filename = get_frame_filename(frame_number, FRAME_PNG_EXT)
             filepath = self.output_dir / filename
-            img.save(str(filepath), "PNG")
-            logger.debug(f"Сохранён PNG кадр: {filepath}")
+            if not cv2.imwrite(str(filepath), canvas, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]):
+                raise IOError(f"Не удалось записать {filepath}")
+            logger.debug("Сохранён PNG кадр: %s", filepath)
             return filepath
 
         except Exception as e:
@@ -265,7 +499,12 @@ class ASCIIConverter:
         """
         logger.info(f"Начало конвертации видео: {video_path}")
 
-        cap = cv2.VideoCapture(video_path)
+        # Многопоточное декодирование FFmpeg; для форматов, которые
+        # бэкенд FFmpeg не открывает, OpenCV выбирает бэкенд сам
+        decode_threads = self.config.decode_threads or os.cpu_count() or 1
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, decode_threads])
+        if not cap.isOpened():
+            cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Не удалось открыть видео: {video_path}")
 
@@ -279,33 +518,72 @@ class ASCIIConverter:
         png_files = []
         frame_number = 0
 
-        try:
-            while frame_number < total_frames:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+        # Конвейер: поток чтения декодирует кадры в очередь, пул потоков или
+        # процессов строит ASCII и рендерит PNG, результаты забираются
+        # в порядке номеров кадров
+        frames_q: queue.Queue = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        # Буферы уже обработанных кадров: декодер пишет в них следующие
+        # кадры вместо выделения нового массива на каждый кадр
+        free_frames: queue.SimpleQueue = queue.SimpleQueue()
+        stop = threading.Event()
+        # Исключение потока чтения, пробрасывается после его завершения
+        reader_errors: list = []
+        reader = threading.Thread(
+            target=self._read_frames,
+            args=(cap, total_frames, frames_q, free_frames, stop, reader_errors),
+            name="vid-reader",
+            daemon=True,
+        )
+        reader.start()
 
-                ascii_text = self.frame_to_ascii(frame)
+        fps = self.config.fps or src_fps
+        video = self.open_video_writer(fps) if self._pipe_mp4 else None
+        # Кадры для MP4 рендерятся, только пока кодировщик открыт
+        encoding = threading.Event()
+        if video is not None:
+            encoding.set()
 
-                if self.config.save_txt:
-                    txt_file = self.save_frame_txt(ascii_text, frame_number)
-                    txt_files.append(txt_file)
+        if self.config.workers > 1:
+            results = self._iter_multiprocess(frames_q, free_frames, encoding)
+        else:
+            results = self._iter_threaded(frames_q, free_frames, encoding)
 
-                if self.config.save_png:
-                    png_file = self.render_frame_png(ascii_text, frame_number)
+        try:
+            for txt_file, png_file, image in results:
+                if txt_file is not None:
+                    txt_files.append(txt_file)
+                if png_file is not None:
                     png_files.append(png_file)
+                if video is not None and image is not None:
+                    video = self._write_video_frame(video, image)
+                    if video is None:
+                        encoding.clear()
 
                 frame_number += 1
-
                 if progress_callback:
                     progress = frame_number / max(total_frames, 1)
                     progress_callback(progress, frame_number, total_frames)
+        except BaseException:
+            if video is not None:
+                self._abort_video(video)
+            raise
         finally:
+            results.close()
+            stop.set()
+            reader.join()
             cap.release()
 
+        if reader_errors:
+            if video is not None:
+                self._abort_video(video)
+            raise reader_errors[0]
+
         mp4_file = None
-        if self.config.save_mp4 and png_files:
-            mp4_file = self.create_video_from_pngs(self.config.fps or src_fps)
+        if video is not None:
+            mp4_file = self.close_video_writer(video)
+            logger.info(f"MP4 файл создан: {mp4_file}")
+        elif self.config.save_mp4 and png_files:
+            mp4_file = self.create_video_from_pngs(fps)
             logger.info(f"MP4 файл создан: {mp4_file}")
 
         logger.info(f"Конвертация завершена: {frame_number} кадров обработано")
@@ -323,6 +601,277 @@ class ASCIIConverter:
         logger.info(f"Результат конвертации: {result}")
         return result
 
+    def _read_frames(
+        self,
+        cap: cv2.VideoCapture,
+        total_frames: int,
+        frames_q: queue.Queue,
+        free_frames: queue.SimpleQueue,
+        stop: threading.Event,
+        errors: list,
+    ):
+        """
+        Поток чтения: декодировать кадры и складывать (номер, кадр) в очередь.
+
+        Ошибка декодирования сохраняется в errors, поток кадров при этом
+        завершается как обычно.
+        """
+        try:
+            frame_number = 0
+            while frame_number < total_frames and not stop.is_set():
+                try:
+                    buffer = free_frames.get_nowait()
+                except queue.Empty:
+                    buffer = None
+                ret, frame = cap.read(buffer)
+                if not ret:
+                    break
+                self._put(frames_q, (frame_number, frame), stop)
+                frame_number += 1
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            # Конец потока кадров
+            self._put(frames_q, None, stop)
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event):
+        """Положить элемент в очередь, не зависая после остановки конвейера"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    @staticmethod
+    def _iter_queue(frames_q: queue.Queue):
+        """Итерировать кадры из очереди до маркера конца"""
+        while (item := frames_q.get()) is not None:
+            yield item
+
+    def _iter_threaded(
+        self,
+        frames_q: queue.Queue,
+        free_frames: queue.SimpleQueue,
+        encoding: threading.Event,
+    ):
+        """
+        Обработать кадры в пуле потоков (OpenCV/NumPy/zlib отпускают GIL).
+
+        Yields:
+            Кортежи (txt_file, png_file, image) в порядке номеров кадров
+        """
+        workers = os.cpu_count() or 1
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vid-frame") as pool:
+            for frame_number, frame in self._iter_queue(frames_q):
+                pending.append(
+                    pool.submit(
+                        self._process_frame,
+                        frame_number,
+                        frame,
+                        free_frames,
+                        encoding.is_set(),
+                    )
+                )
+                if len(pending) >= FRAME_QUEUE_SIZE:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _iter_multiprocess(
+        self,
+        frames_q: queue.Queue,
+        free_frames: queue.SimpleQueue,
+        encoding: threading.Event,
+    ):
+        """
+        Обработать кадры в пуле из config.workers процессов.
+
+        Кадр уменьшается до сетки индексов символов в текущем процессе,
+        поэтому воркерам передаются только небольшие массивы (height, width),
+        а не полноразмерные кадры. Воркеры сохраняют TXT/PNG и возвращают
+        только пути; кадр для MP4 рендерится здесь же при выдаче результата,
+        так что в памяти не копятся полноразмерные холсты. Число кадров
+        в работе ограничено, как в _iter_threaded.
+
+        Yields:
+            Кортежи (txt_file, png_file, image) в порядке номеров кадров
+        """
+        max_pending = max(FRAME_QUEUE_SIZE, 2 * self.config.workers)
+        pending = deque()
+        # spawn: fork из многопоточного процесса сервера небезопасен
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            self.config.workers,
+            initializer=_init_worker,
+            initargs=(str(self.output_dir), self.config),
+        ) as pool:
+            for frame_number, frame in self._iter_queue(frames_q):
+                indices = self._frame_to_indices_release(frame, free_frames)
+                task = pool.apply_async(_process_indices, ((frame_number, indices),))
+                pending.append((indices, task))
+                if len(pending) >= max_pending:
+                    yield self._collect_pooled(*pending.popleft(), encoding)
+            while pending:
+                yield self._collect_pooled(*pending.popleft(), encoding)
+
+    def _collect_pooled(self, indices: np.ndarray, task, encoding: threading.Event):
+        """Дождаться задачи пула процессов и дорендерить кадр для MP4"""
+        txt_file, png_file = task.get()
+        image = self.render_frame_image(indices) if encoding.is_set() else None
+        return txt_file, png_file, image
+
+    def _process_frame(
+        self,
+        frame_number: int,
+        frame: np.ndarray,
+        free_frames: queue.SimpleQueue,
+        render_image: bool,
+    ):
+        """Обработать один кадр: ASCII текст и/или PNG"""
+        indices = self._frame_to_indices_release(frame, free_frames)
+        return self._save_frame_outputs(frame_number, indices, render_image)
+
+    def _frame_to_indices_release(
+        self, frame: np.ndarray, free_frames: queue.SimpleQueue
+    ) -> np.ndarray:
+        """Получить матрицу индексов и вернуть буфер кадра декодеру"""
+        indices = self.frame_to_indices(frame)
+        free_frames.put(frame)
+        return indices
+
+    def _save_frame_outputs(
+        self, frame_number: int, indices: np.ndarray, render_image: bool = False
+    ):
+        """
+        Сохранить кадр по матрице индексов символов
+
+        Args:
+            render_image: Вернуть отрендеренный кадр для открытого кодировщика MP4
+
+        Returns:
+            Кортеж (txt_file, png_file, image), None для несохранённых форматов
+        """
+        txt_file = None
+        if self.config.save_txt:
+            txt_file = self.save_frame_txt(self.indices_to_ascii(indices), frame_number)
+
+        png_file = None
+        if self.config.save_png:
+            png_file = self.render_frame_png(indices, frame_number)
+
+        image = None
+        if render_image:
+            image = self.render_frame_image(indices)
+
+        return txt_file, png_file, image
+
+    def open_video_pipe(self, fps: float) -> Optional[FFmpegProcess]:
+        """
+        Запустить ffmpeg, принимающий сырые BGR кадры через stdin.
+
+        Returns:
+            Процесс ffmpeg или None, если его не удалось запустить
+        """
+        output_file = self.output_dir / get_video_filename(VIDEO_MP4_EXT)
+        cmd = [
+            "ffmpeg",
+            "-y",
+            "-loglevel", "error",
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-s", f"{self.out_width}x{self.out_height}",
+            "-r", str(fps),
+            "-i", "-",
+            "-vf", "format=yuv420p",
+            "-crf", str(self.config.crf),
+            "-preset", self.config.preset,
+            "-threads", str(self.config.encode_threads),
+            str(output_file),
+        ]
+
+        logger.info(f"Создание видео: {output_file}")
+        logger.debug(f"FFmpeg команда: {' '.join(cmd)}")
+
+        try:
+            return FFmpegProcess(cmd, stdin=subprocess.PIPE)
+        except Exception as e:
+            logger.error(f"Ошибка при создании видео: {str(e)}")
+            return None
+
+    def open_video_writer(
+        self, fps: float
+    ) -> Optional[Union[FFmpegProcess, cv2.VideoWriter]]:
+        """
+        Открыть кодировщик MP4 для покадровой записи.
+
+        Основной путь - ffmpeg через pipe (учитывает crf). Если ffmpeg
+        не установлен, используется cv2.VideoWriter с кодеком avc1,
+        когда он доступен в сборке OpenCV.
+
+        Returns:
+            Процесс ffmpeg, cv2.VideoWriter или None
+        """
+        if shutil.which("ffmpeg"):
+            return self.open_video_pipe(fps)
+
+        output_file = self.output_dir / get_video_filename(VIDEO_MP4_EXT)
+        writer = cv2.VideoWriter(
+            str(output_file),
+            cv2.VideoWriter_fourcc(*"avc1"),
+            fps,
+            (self.out_width, self.out_height),
+        )
+        if not writer.isOpened():
+            logger.error("Ошибка при создании видео: ffmpeg не найден, кодек avc1 недоступен")
+            return None
+
+        logger.info(f"Создание видео через OpenCV: {output_file}")
+        return writer
+
+    def _write_video_frame(self, video, image: np.ndarray):
+        """Передать кадр кодировщику; при ошибке запись прекращается и возвращается None"""
+        if isinstance(video, cv2.VideoWriter):
+            video.write(image)
+            return video
+
+        try:
+            video.stdin.write(image.data)
+            return video
+        except (BrokenPipeError, OSError) as e:
+            logger.error(f"Ошибка при записи кадра в ffmpeg: {str(e)}")
+            self.close_video_pipe(video)
+            return None
+
+    @staticmethod
+    def _abort_video(video):
+        """Прервать кодирование без ожидания результата"""
+        if isinstance(video, cv2.VideoWriter):
+            video.release()
+        else:
+            video.kill()
+
+    def close_video_writer(self, video) -> Optional[Path]:
+        """Завершить кодирование MP4"""
+        if isinstance(video, cv2.VideoWriter):
+            video.release()
+            output_file = self.output_dir / get_video_filename(VIDEO_MP4_EXT)
+            logger.info(f"Видео успешно создано: {output_file}")
+            return output_file
+        return self.close_video_pipe(video)
+
+    def close_video_pipe(self, proc: FFmpegProcess) -> Optional[Path]:
+        """Закрыть stdin ffmpeg и дождаться завершения кодирования"""
+        output_file = self.output_dir / get_video_filename(VIDEO_MP4_EXT)
+        if proc.wait() != 0:
+            logger.error(f"FFmpeg ошибка: {proc.stderr_text}")
+            return None
+
+        logger.info(f"Видео успешно создано: {output_file}")
+        return output_file
+
     def create_video_from_pngs(self, fps: int) -> Optional[Path]:
         """Создать MP4 видео из PNG файлов"""
         try:
@@ -332,21 +881,22 @@ class ASCIIConverter:
             cmd = [
                 "ffmpeg",
                 "-y",
+                "-loglevel", "error",
                 "-framerate", str(fps),
                 "-i", input_pattern,
                 "-vf", "format=yuv420p",
                 "-crf", str(self.config.crf),
-                "-preset", "medium",
+                "-preset", self.config.preset,
+                "-threads", str(self.config.encode_threads),
                 str(output_file),
             ]
 
             logger.info(f"Создание видео: {output_file}")
             logger.debug(f"FFmpeg команда: {' '.join(cmd)}")
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode != 0:
-                logger.error(f"FFmpeg ошибка: {result.stderr}")
+            proc = FFmpegProcess(cmd)
+            if proc.wait() != 0:
+                logger.error(f"FFmpeg ошибка: {proc.stderr_text}")
                 return None
 
             logger.info(f"Видео успешно создано: {output_file}")
@@ -355,3 +905,25 @@ class ASCIIConverter:
         except Exception as e:
             logger.error(f"Ошибка при создании видео: {str(e)}")
             return None
+
+
+# Конвертер процесса-воркера пула, создаётся один раз в _init_worker
+_worker_converter: Optional[ASCIIConverter] = None
+
+
+def _init_worker(output_dir: str, config: ConvertConfig):
+    """Инициализатор процесса пула: шрифт и атлас глифов строятся один раз"""
+    global _worker_converter
+    _worker_converter = ASCIIConverter(output_dir, config)
+
+
+def _process_indices(item):
+    """
+    Задача пула процессов: сохранить кадр по (номер, матрица индексов)
+
+    Returns:
+        Кортеж (txt_file, png_file)
+    """
+    frame_number, indices = item
+    txt_file, png_file, _ = _worker_converter._save_frame_outputs(frame_number, indices)
+    return txt_file, png_file
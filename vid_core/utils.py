@@ -5,12 +5,18 @@
 import os
 import shutil
 import logging
+import time
 from pathlib import Path
 from typing import Tuple, Optional
 import re
 
 logger = logging.getLogger(__name__)
 
+# Недопустимые в имени файла символы заменяются на "_"
+_INVALID_FN_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+_MULTI_UNDERSCORE_RE = re.compile(r'_+')
+_HEX_COLOR_RE = re.compile(r'^#[0-9a-fA-F]{6}$')
+
 
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Преобразовать HEX цвет в RGB"""
@@ -31,8 +37,7 @@ def hex_to_bgr(hex_color: str) -> Tuple[int, int, int]:
 
 def is_valid_hex_color(color: str) -> bool:
     """Проверить, является ли строка корректным HEX цветом"""
-    pattern = r'^#[0-9a-fA-F]{6}$'
-    return bool(re.match(pattern, color))
+    return bool(_HEX_COLOR_RE.match(color))
 
 
 def ensure_dir(path: str) -> Path:
@@ -68,10 +73,9 @@ def get_file_size_mb(file_path: str) -> float:
 def sanitize_filename(filename: str) -> str:
     """Санитизировать имя файла"""
     # Заменить недопустимые символы
-    invalid_chars = r'[<>:"/\\|?*]'
-    sanitized = re.sub(invalid_chars, '_', filename)
+    sanitized = filename.translate(_INVALID_FN_TABLE)
     # Заменить множественные подчёркивания на одно
-    sanitized = re.sub(r'_+', '_', sanitized)
+    sanitized = _MULTI_UNDERSCORE_RE.sub('_', sanitized)
     # Удалить ведущие/завершающие подчёркивания
     sanitized = sanitized.strip('_')
     return sanitized
@@ -137,19 +141,24 @@ def get_safe_output_path(base_dir: str, filename: str) -> str:
 
 def cleanup_old_files(directory: str, max_age_hours: int = 24) -> int:
     """Удалить старые файлы из директории"""
-    import time
     current_time = time.time()
     max_age_seconds = max_age_hours * 3600
     deleted_count = 0
     
     try:
-        for file_path in Path(directory).glob('**/*'):
-            if file_path.is_file():
-                file_age = current_time - file_path.stat().st_mtime
-                if file_age > max_age_seconds:
-                    file_path.unlink()
-                    deleted_count += 1
-                    logger.debug(f"Удалён старый файл: {file_path}")
+        # os.scandir отдаёт тип записи без отдельного stat на каждый файл
+        stack = [directory]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        file_age = current_time - entry.stat().st_mtime
+                        if file_age > max_age_seconds:
+                            os.unlink(entry.path)
+                            deleted_count += 1
+                            logger.debug(f"Удалён старый файл: {entry.path}")
     except Exception as e:
         logger.error(f"Ошибка при очистке старых файлов: {str(e)}")
     